@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-14 17:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0005_traineeprogress_trainer_comment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='miniproject',
+            index=models.Index(fields=['priority', 'due_date'], name='tracker_min_priorit_a9d33d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='traineeprogress',
+            index=models.Index(fields=['project', 'status'], name='tracker_tra_project_d8c462_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='traineeprogress',
+            index=models.Index(fields=['trainee', 'status'], name='tracker_tra_trainee_ac5da5_idx'),
+        ),
+    ]
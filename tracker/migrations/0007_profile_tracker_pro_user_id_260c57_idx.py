@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-14 17:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0006_miniproject_tracker_min_priorit_a9d33d_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['user', 'role'], name='tracker_pro_user_id_260c57_idx'),
+        ),
+    ]
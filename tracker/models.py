@@ -10,6 +10,12 @@ class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default="trainee")
 
+    class Meta:
+        # covers the per-request role lookup (user_id -> role) without touching the table
+        indexes = [
+            models.Index(fields=["user", "role"]),
+        ]
+
     def __str__(self):
         return f"{self.user.username} ({self.role})"
 
@@ -34,6 +40,9 @@ class MiniProject(models.Model):
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["priority", "due_date"]),
+        ]
 
     def __str__(self):
         return self.title
@@ -62,6 +71,11 @@ class TraineeProgress(models.Model):
 
     class Meta:
         unique_together = ("trainee", "project")  # one progress per trainee per project
+        # back the ?status= filter on the mini-projects list
+        indexes = [
+            models.Index(fields=["project", "status"]),
+            models.Index(fields=["trainee", "status"]),
+        ]
 
     def __str__(self):
         return f"{self.trainee.username} progress on {self.project.title}"
@@ -1,12 +1,38 @@
 from rest_framework import permissions
 import logging
 
+from .models import Profile
+
 logger = logging.getLogger(__name__)
 
+_SENTINEL = object()
+
+# allowed trainee fields for partial/put update on progress
+TRAINEE_ALLOWED_FIELDS = frozenset({"status", "report", "deployment_link", "github_link", "completed_at"})
+
+# keys that may appear in request data but should be ignored for permission checks
+_IGNORED_KEYS = frozenset({"csrfmiddlewaretoken"})
+
+
+def get_role(request):
+    """
+    Return the profile role of request.user, looked up once per request.
+    Permissions, views and serializers all ask for it, so the value is cached on the request.
+    """
+    role = getattr(request, "_cached_role", _SENTINEL)
+    if role is _SENTINEL:
+        user = getattr(request, "user", None)
+        if user and user.is_authenticated:
+            role = Profile.objects.filter(user=user).values_list("role", flat=True).first()
+        else:
+            role = None
+        request._cached_role = role
+    return role
+
+
 class IsTrainer(permissions.BasePermission):
     def has_permission(self, request, view):
-        user = request.user
-        return bool(user and user.is_authenticated and getattr(user, "profile", None) and user.profile.role == "trainer")
+        return get_role(request) == "trainer"
 
 
 class IsAssignedOrTrainerOrReadOnly(permissions.BasePermission):
@@ -17,11 +43,8 @@ class IsAssignedOrTrainerOrReadOnly(permissions.BasePermission):
       - Trainees: allowed only if they are assigned to the object and only for PATCH/PUT (on my_progress)
         and only for allowed fields.
     """
-    # allowed trainee fields for partial/put update on progress:
-    TRAINEE_ALLOWED_FIELDS = {"status", "report", "deployment_link", "github_link", "completed_at"}
-
-    # keys that may appear in request data but should be ignored for permission checks
-    _IGNORED_KEYS = {"csrfmiddlewaretoken"}
+    TRAINEE_ALLOWED_FIELDS = TRAINEE_ALLOWED_FIELDS
+    _IGNORED_KEYS = _IGNORED_KEYS
 
     def has_permission(self, request, view):
         # allow list and create to be checked in the view
@@ -37,28 +60,26 @@ class IsAssignedOrTrainerOrReadOnly(permissions.BasePermission):
             return False
 
         # Trainers: full access
-        if getattr(user, "profile", None) and user.profile.role == "trainer":
+        if get_role(request) == "trainer":
             return True
 
         # For trainees: allow only if they are assigned_to the project
-        if user in obj.assigned_to.all():
+        if obj.assigned_to.filter(pk=user.pk).exists():
             # If this is the custom action 'my_progress' on the view: allow PATCH/PUT for trainee
             action = getattr(view, "action", None)
             if action == "my_progress" and request.method in ("PATCH", "PUT"):
                 # Defensive: extract keys from request.data (works with QueryDict, dict, MultiPart)
                 try:
-                    raw_keys = set(request.data.keys())
+                    keys = request.data.keys() - self._IGNORED_KEYS
                 except Exception:
-                    raw_keys = set()
-
-                keys = set(k for k in raw_keys if k not in self._IGNORED_KEYS)
+                    keys = set()
 
                 # If no keys provided (empty body), deny (or you can allow if you prefer)
                 if not keys:
                     logger.debug("Denied my_progress: no updatable keys provided by trainee %s", getattr(user, "username", None))
                     return False
 
-                if keys.issubset(self.TRAINEE_ALLOWED_FIELDS):
+                if keys <= self.TRAINEE_ALLOWED_FIELDS:
                     return True
 
                 # denied: log which unexpected keys were present
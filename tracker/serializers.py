@@ -1,29 +1,51 @@
+from copy import copy, deepcopy
+
 from django.db import transaction
 from django.contrib.auth.models import User
 from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField
 
 from .models import MiniProject, TraineeProgress
 
-
-class UserSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = User
-        fields = ("id", "username", "email")
+# serializer class -> fields built by ModelSerializer.get_fields() (unbound templates)
+_field_cache = {}
 
 
-class UserWithRoleSerializer(serializers.ModelSerializer):
+class CachedFieldsMixin:
     """
-    Expose profile.role as `role` so frontend can consume `/me/` response easily.
+    Build the ModelSerializer field map once per class instead of on every instantiation.
+
+    Plain fields are shallow-copied from the cached templates. Nested serializers and
+    many=True relations keep a child that gets bound to its parent, so those are still
+    deep-copied to avoid sharing a child (and its request context) between instances.
     """
-    role = serializers.CharField(source="profile.role", read_only=True)
 
+    def get_fields(self):
+        cls = type(self)
+        fields = _field_cache.get(cls)
+        if fields is None:
+            fields = _field_cache[cls] = super().get_fields()
+        return {
+            name: deepcopy(field) if isinstance(field, (serializers.BaseSerializer, ManyRelatedField)) else copy(field)
+            for name, field in fields.items()
+        }
+
+
+class UserSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ("id", "username", "email", "role")
+        fields = ("id", "username", "email")
 
-class TraineeProgressSerializer(serializers.ModelSerializer):
+
+class TraineeProgressSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     trainee_details = UserSerializer(source="trainee", read_only=True)
     report_url = serializers.SerializerMethodField(read_only=True)
+    # accept ISO 8601 as well as the seconds-less value an <input type="datetime-local"> sends
+    completed_at = serializers.DateTimeField(
+        required=False,
+        allow_null=True,
+        input_formats=["iso-8601", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M"],
+    )
 
     class Meta:
         model = TraineeProgress
@@ -35,25 +57,28 @@ class TraineeProgressSerializer(serializers.ModelSerializer):
         read_only_fields = ("updated_at",)
 
     def get_report_url(self, obj):
-        request = self.context.get("request")
         if not obj.report:
             return None
         try:
             url = obj.report.url  # FieldFile
         except Exception:
             url = str(obj.report)  # plain string fallback
-        if url.startswith("http://") or url.startswith("https://"):
+        if url.startswith(("http://", "https://")):
+            return url
+        request = self.context.get("request")
+        if not request:
             return url
-        if request:
+        if not url.startswith("/") or url.startswith("//"):
+            # relative or protocol-relative (//cdn/...) urls need real resolution
             return request.build_absolute_uri(url)
-        # fallback: prefix with MEDIA_URL if request not available
-        from django.conf import settings
-        if url.startswith(settings.MEDIA_URL):
-            return request.build_absolute_uri(url) if request else (settings.MEDIA_URL + url[len(settings.MEDIA_URL):])
-        return url
+        # scheme + host is the same for every entry in the response, so build it once
+        host_prefix = self.context.get("_host_prefix")
+        if host_prefix is None:
+            host_prefix = self.context["_host_prefix"] = request.build_absolute_uri("/")[:-1]
+        return host_prefix + url
 
 
-class MiniProjectSerializer(serializers.ModelSerializer):
+class MiniProjectSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for MiniProject.
 
@@ -61,12 +86,16 @@ class MiniProjectSerializer(serializers.ModelSerializer):
       - assigned_to is writable as a list of user PKs (many=True).
       - created_by is read-only and should be set by the view (perform_create).
       - serializer.create/update only handle M2M assignment and normal fields.
+      - progress_entries renders instance.visible_progress_entries as-is; which entries a
+        trainee may see is decided once per request by the view's prefetch, so the
+        serializer never looks at the requesting user's role.
     """
     assigned_to = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(), many=True, required=False, allow_empty=True
     )
     assigned_to_details = UserSerializer(source="assigned_to", many=True, read_only=True)
-    progress_entries = TraineeProgressSerializer(many=True, read_only=True)
+    # populated by MiniProjectViewSet.get_queryset, already limited to what the requesting user may see
+    progress_entries = TraineeProgressSerializer(source="visible_progress_entries", many=True, read_only=True)
 
     class Meta:
         model = MiniProject
@@ -98,17 +127,19 @@ class MiniProjectSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """
         Create a MiniProject instance while safely handling M2M assigned_to.
-        NOTE: Do NOT set created_by here — the view should call serializer.save(created_by=...)
-        to set that field. This avoids duplication of responsibility.
+        NOTE: created_by is not read from the payload — the view calls serializer.save(created_by=...)
+        and it arrives here in validated_data, so the row is inserted with it in one go.
         """
         assigned_users = validated_data.pop("assigned_to", [])
-        # create the object without created_by (view will set it via serializer.save(created_by=...))
         obj = MiniProject.objects.create(**validated_data)
 
         # set M2M if provided
         if assigned_users:
             obj.assigned_to.set(assigned_users)
 
+        # a brand-new project has no progress yet; mirrors the to_attr prefetch done by the view
+        obj.visible_progress_entries = []
+
         return obj
 
     @transaction.atomic
@@ -130,26 +161,3 @@ class MiniProjectSerializer(serializers.ModelSerializer):
             instance.assigned_to.set(assigned_users)
 
         return instance
-
-    def to_representation(self, instance):
-        """
-        Limit progress_entries visible to trainees: trainees see only their own progress entry.
-        Trainers and other roles see all progress entries.
-        """
-        data = super().to_representation(instance)
-        request = self.context.get("request") if self.context else None
-        if not request or not getattr(request, "user", None):
-            return data
-
-        user = request.user
-        role = getattr(getattr(user, "profile", None), "role", None)
-
-        if role == "trainee":
-            try:
-                user_id = int(user.id)
-            except Exception:
-                return data
-            entries = data.get("progress_entries", []) or []
-            data["progress_entries"] = [pe for pe in entries if int(pe.get("trainee") or 0) == user_id]
-
-        return data
@@ -1,7 +1,9 @@
-from django.db.models.signals import post_save
+from django.db.models import Q
+from django.db.models.signals import post_save, pre_delete, m2m_changed
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import Profile
+from django.utils import timezone
+from .models import Profile, MiniProject
 
 @receiver(post_save, sender=User)
 def create_or_update_profile(sender, instance, created, **kwargs):
@@ -10,3 +12,55 @@ def create_or_update_profile(sender, instance, created, **kwargs):
     else:
         # ensure profile exists
         Profile.objects.get_or_create(user=instance)
+
+
+# The mini-projects list ETag / Last-Modified is built from MiniProject.updated_at, so
+# changes that don't save the project row itself still have to bump it.
+
+def _touch_projects(project_ids):
+    if project_ids:
+        MiniProject.objects.filter(pk__in=project_ids).update(updated_at=timezone.now())
+
+
+def _touch_projects_of_user(user, include_created=False):
+    lookup = Q(assigned_to=user) | Q(progress_entries__trainee=user)
+    if include_created:
+        lookup |= Q(created_by=user)
+    project_ids = (
+        MiniProject.objects.filter(lookup)
+        .values_list("pk", flat=True)
+        .distinct()
+    )
+    _touch_projects(list(project_ids))
+
+
+@receiver(m2m_changed, sender=MiniProject.assigned_to.through)
+def touch_projects_on_assignment_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # project.assigned_to.add/remove/clear(...)
+        if action in ("post_add", "post_remove", "post_clear"):
+            _touch_projects([instance.pk])
+        return
+
+    # user.mini_projects.add/remove/clear(...): pk_set holds project ids, except for clear
+    if action == "pre_clear":
+        instance._cleared_project_ids = list(instance.mini_projects.values_list("pk", flat=True))
+    elif action == "post_clear":
+        _touch_projects(getattr(instance, "_cleared_project_ids", None))
+    elif action in ("post_add", "post_remove"):
+        _touch_projects(pk_set)
+
+
+@receiver(post_save, sender=User)
+def touch_projects_on_user_change(sender, instance, created, update_fields=None, **kwargs):
+    # username/email are rendered in assigned_to_details and trainee_details
+    if created or (update_fields is not None and not {"username", "email"} & set(update_fields)):
+        return
+    _touch_projects_of_user(instance)
+
+
+@receiver(pre_delete, sender=User)
+def touch_projects_on_user_delete(sender, instance, **kwargs):
+    # the assigned_to rows are cascaded away without m2m_changed, and created_by is
+    # SET_NULL through a queryset update that skips auto_now
+    _touch_projects_of_user(instance, include_created=True)
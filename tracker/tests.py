@@ -1,3 +1,145 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from .models import MiniProject, TraineeProgress
+
+
+class MiniProjectTestBase(APITestCase):
+    def setUp(self):
+        self.trainer = User.objects.create_user("trainer", "trainer@example.com", "pw")
+        self.trainer.profile.role = "trainer"
+        self.trainer.profile.save()
+        self.trainee1 = User.objects.create_user("trainee1", "trainee1@example.com", "pw")
+        self.trainee2 = User.objects.create_user("trainee2", "trainee2@example.com", "pw")
+
+        self.project = MiniProject.objects.create(title="Project", created_by=self.trainer)
+        self.project.assigned_to.set([self.trainee1, self.trainee2])
+        self.progress1 = TraineeProgress.objects.create(trainee=self.trainee1, project=self.project, status="inprogress")
+        self.progress2 = TraineeProgress.objects.create(trainee=self.trainee2, project=self.project, status="todo")
+
+        self.list_url = "/api/mini-projects/"
+        self.detail_url = f"/api/mini-projects/{self.project.pk}/"
+
+
+class ConditionalListTests(MiniProjectTestBase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.trainer)
+
+    def get_etag(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", response)
+        return response["ETag"]
+
+    def test_list_returns_etag(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(response["ETag"], r'^"[0-9a-f]{32}"$')
+        self.assertNotIn("Last-Modified", response)
+        self.assertEqual(len(response.data), 1)
+
+    def test_matching_if_none_match_returns_304(self):
+        etag = self.get_etag()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_modified_since_alone_is_not_a_validator(self):
+        self.get_etag()
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deleting_older_project_invalidates_etag(self):
+        newer = MiniProject.objects.create(title="Newer", created_by=self.trainer)
+        etag = self.get_etag()
+        self.project.delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p["id"] for p in response.data], [newer.pk])
+
+    def test_progress_edit_invalidates_etag(self):
+        etag = self.get_etag()
+        self.progress1.status = "complete"
+        self.progress1.save()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_status_filtered_list_tracks_all_rendered_progress(self):
+        url = self.list_url + "?status=inprogress"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+
+        # trainee2's entry is 'todo', outside the status filter, but still rendered
+        response = self.client.post(
+            f"{self.detail_url}comment/", {"trainee": self.trainee2.pk, "comment": "Looks good"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        comments = {entry["trainee"]: entry["trainer_comment"] for entry in response.data[0]["progress_entries"]}
+        self.assertEqual(comments[self.trainee2.pk], "Looks good")
+
+    def test_assignment_change_invalidates_etag(self):
+        trainee3 = User.objects.create_user("trainee3", "trainee3@example.com", "pw")
+        etag = self.get_etag()
+        self.project.assigned_to.add(trainee3)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(trainee3.pk, response.data[0]["assigned_to"])
+
+    def test_reverse_assignment_change_invalidates_etag(self):
+        etag = self.get_etag()
+        self.trainee2.mini_projects.clear()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]["assigned_to"], [self.trainee1.pk])
+
+    def test_creator_delete_invalidates_etag(self):
+        creator = User.objects.create_user("creator", "creator@example.com", "pw")
+        project = MiniProject.objects.create(title="Created", created_by=creator)
+        self.project.save()  # keep a different project as the newest
+        etag = self.get_etag()
+        creator.delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        created_by = {p["id"]: p["created_by"] for p in response.data}
+        self.assertIsNone(created_by[project.pk])
+
+    def test_assigned_user_change_invalidates_etag(self):
+        etag = self.get_etag()
+        self.trainee1.email = "renamed@example.com"
+        self.trainee1.save()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ProgressVisibilityTests(MiniProjectTestBase):
+    def entry_trainees(self, project_data):
+        return sorted(entry["trainee"] for entry in project_data["progress_entries"])
+
+    def test_trainee_list_shows_only_own_progress(self):
+        self.client.force_authenticate(self.trainee1)
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.entry_trainees(response.data[0]), [self.trainee1.pk])
+
+    def test_trainee_retrieve_shows_only_own_progress(self):
+        self.client.force_authenticate(self.trainee2)
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.entry_trainees(response.data), [self.trainee2.pk])
+
+    def test_trainer_sees_all_progress(self):
+        self.client.force_authenticate(self.trainer)
+        expected = sorted([self.trainee1.pk, self.trainee2.pk])
+
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.entry_trainees(response.data[0]), expected)
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.entry_trainees(response.data), expected)
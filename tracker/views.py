@@ -1,10 +1,13 @@
+import hashlib
 import logging
 import traceback
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.db.models import Count, Max, Prefetch
 from django.utils import timezone
-from django.utils.dateparse import parse_datetime
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 
 from rest_framework import viewsets, status, generics, filters
 from rest_framework.views import APIView
@@ -19,12 +22,17 @@ from .serializers import (
     MiniProjectSerializer,
     UserSerializer,
     TraineeProgressSerializer,
-    UserWithRoleSerializer,
 )
-from .permissions import IsAssignedOrTrainerOrReadOnly, IsTrainer
+from .permissions import IsAssignedOrTrainerOrReadOnly, IsTrainer, get_role
 
 logger = logging.getLogger(__name__)
 
+# nested user payloads only render UserSerializer's columns, so don't hydrate the rest of auth_user
+USER_SUMMARY_FIELDS = UserSerializer.Meta.fields
+_TRAINEE_DEFERRED_FIELDS = [
+    f"trainee__{field.name}" for field in User._meta.concrete_fields if field.name not in USER_SUMMARY_FIELDS
+]
+
 
 class MiniProjectViewSet(viewsets.ModelViewSet):
     """
@@ -32,8 +40,7 @@ class MiniProjectViewSet(viewsets.ModelViewSet):
 
     Important behaviour:
       - serializer is always initialized with context={'request': request}
-      - perform_create will save then ensure created_by is set on the saved instance
-        (avoids passing unexpected kwargs into serializer.create())
+      - perform_create passes created_by into serializer.save() so the project is a single INSERT
       - create() will return traceback JSON when DEBUG=True to help local debugging
     """
     queryset = MiniProject.objects.all()
@@ -44,6 +51,9 @@ class MiniProjectViewSet(viewsets.ModelViewSet):
     search_fields = ["title", "description"]
     ordering_fields = ["due_date", "priority", "created_at"]
 
+    # actions whose response is a MiniProjectSerializer payload (see get_queryset)
+    PREFETCH_ACTIONS = ("list", "retrieve", "update", "partial_update")
+
     def get_permissions(self):
         # Trainers can create/update/delete full projects
         if self.action in ("create", "destroy", "update", "partial_update"):
@@ -62,7 +72,7 @@ class MiniProjectViewSet(viewsets.ModelViewSet):
         if not user or not user.is_authenticated:
             return MiniProject.objects.none()
 
-        is_trainer = getattr(user, "profile", None) and getattr(user.profile, "role", None) == "trainer"
+        is_trainer = get_role(self.request) == "trainer"
         qs = MiniProject.objects.all() if is_trainer else MiniProject.objects.filter(assigned_to=user)
 
         # optional status filter
@@ -72,31 +82,87 @@ class MiniProjectViewSet(viewsets.ModelViewSet):
                 qs = qs.filter(progress_entries__status=status_filter)
             else:
                 qs = qs.filter(progress_entries__status=status_filter, progress_entries__trainee=user)
+            # only the progress_entries join can repeat a project; assigned_to=user is unique per project
+            qs = qs.distinct()
+
+        # only actions that render MiniProjectSerializer need the nested rows;
+        # my_progress / comment / destroy would just throw the prefetches away
+        if self.action not in self.PREFETCH_ACTIONS:
+            return qs
+
+        # trainees only ever see their own progress entry, so filter it in the prefetch
+        # rather than serializing every entry and dropping the rest
+        progress_qs = TraineeProgress.objects.select_related("trainee").defer(*_TRAINEE_DEFERRED_FIELDS)
+        if not is_trainer:
+            progress_qs = progress_qs.filter(trainee=user)
+
+        # pull in everything MiniProjectSerializer walks so listing stays a constant number of queries
+        # (created_by is rendered as a pk only, so it needs no join)
+        qs = qs.prefetch_related(
+            Prefetch("assigned_to", queryset=User.objects.only(*USER_SUMMARY_FIELDS)),
+            Prefetch("progress_entries", queryset=progress_qs, to_attr="visible_progress_entries"),
+        )
+
+        return qs
+
+    def list(self, request, *args, **kwargs):
+        """
+        Same as ListModelMixin.list, but answers conditional GETs (If-None-Match)
+        with 304 before any serialization happens.
+
+        The ETag is the only validator. No Last-Modified is sent: a max timestamp
+        can't move when a non-newest project is deleted, and it only has second
+        resolution, so If-Modified-Since would give false 304s.
+
+        The ETag is built from the filtered queryset's project count and newest
+        updated_at, plus the newest updated_at of the progress entries the response
+        renders. The count catches deletions and unassignments that leave the max
+        timestamps unchanged. Assignment and assigned-user changes bump
+        MiniProject.updated_at from tracker/signals.py.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        user = request.user
 
-        return qs.distinct()
+        stamp = queryset.aggregate(count=Count("pk", distinct=True), project=Max("updated_at"))
+        # not reusing the ?status= join: the response renders visible_progress_entries
+        # of every status, so every one of them has to count
+        progress = TraineeProgress.objects.filter(project__in=queryset.values("pk"))
+        if get_role(request) != "trainer":
+            progress = progress.filter(trainee=user)
+        stamp["progress"] = progress.aggregate(m=Max("updated_at"))["m"]
+
+        # hashed so the header doesn't reveal when projects or progress rows were last touched
+        material = "{}-{}-{}-{}".format(user.id, stamp["count"], stamp["project"], stamp["progress"])
+        etag = quote_etag(hashlib.md5(material.encode(), usedforsecurity=False).hexdigest())
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                response = self.get_paginated_response(serializer.data)
+            else:
+                serializer = self.get_serializer(queryset, many=True)
+                response = Response(serializer.data)
+
+        response["ETag"] = etag
+        # per-user data: let the client keep it, but always revalidate
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
     def perform_create(self, serializer):
         """
-        Save serializer then ensure created_by is set.
-        We avoid passing created_by into serializer.save() to prevent signature mismatch
-        with serializer.create().
+        Save the project with created_by set, in the same INSERT as the other fields.
+        serializer.create() receives it through validated_data.
         """
-        obj = serializer.save()  # serializer.create handles M2M assigned_to as implemented in serializer
-        # If created_by was not set by serializer, set it now and save again.
-        try:
-            if getattr(obj, "created_by", None) is None and getattr(self.request, "user", None) and self.request.user.is_authenticated:
-                obj.created_by = self.request.user
-                obj.save()
-        except Exception:
-            # If saving created_by fails, log and re-raise so create() can catch and return useful info during DEBUG.
-            logger.exception("Failed to set created_by on MiniProject (id=%s)", getattr(obj, "id", None))
-            raise
+        user = self.request.user
+        serializer.save(created_by=user if user.is_authenticated else None)
 
     def create(self, request, *args, **kwargs):
         """
         Override create to:
          - pass request into serializer context
-         - catch exceptions and log full traceback
+         - catch exceptions and log them with their traceback
          - return traceback in response when DEBUG=True (local debugging only)
         """
         logger.debug("MiniProject.create called by user=%s payload=%s", getattr(request.user, "id", None), request.data)
@@ -108,15 +174,15 @@ class MiniProjectViewSet(viewsets.ModelViewSet):
             headers = self.get_success_headers(serializer.data)
             return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
         except Exception as exc:
-            tb = traceback.format_exc()
-            logger.error("Error creating MiniProject (user=%s): %s\n%s", getattr(request.user, "id", None), str(exc), tb)
+            # logger.exception only renders the traceback if a handler actually emits the record
+            logger.exception("Error creating MiniProject (user=%s): %s", getattr(request.user, "id", None), str(exc))
 
             if getattr(settings, "DEBUG", False):
                 # Helpful for local debugging — do not enable in production.
                 return Response({
                     "detail": "Server error while creating MiniProject.",
                     "error": str(exc),
-                    "traceback": tb,
+                    "traceback": traceback.format_exc(),
                     "payload": request.data,
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -138,38 +204,29 @@ class MiniProjectViewSet(viewsets.ModelViewSet):
         project = self.get_object()
         user = request.user
 
-        # ensure user is assigned
-        if user not in project.assigned_to.all():
+        # ensure user is assigned; for trainees get_queryset already limited get_object()
+        # to projects with assigned_to=user, so only trainers need the extra lookup
+        if get_role(request) == "trainer" and not project.assigned_to.filter(pk=user.pk).exists():
             return Response({"detail": "Not assigned to this project."}, status=status.HTTP_403_FORBIDDEN)
 
         progress, _ = TraineeProgress.objects.get_or_create(trainee=user, project=project)
+        # the trainee is request.user; don't refetch it for trainee_details
+        progress.trainee = user
 
         if request.method in ("PATCH", "PUT"):
             partial = request.method == "PATCH"
             serializer = self.get_serializer(progress, data=request.data, partial=partial, context={"request": request})
             serializer.is_valid(raise_exception=True)
-            updated = serializer.save()
-
-            # Persist client-sent completed_at if provided (support ISO and datetime-local)
-            client_completed = request.data.get("completed_at")
-            if client_completed:
-                parsed = parse_datetime(client_completed)
-                if parsed is None:
-                    # try normalization for 'YYYY-MM-DDTHH:MM'
-                    try:
-                        if isinstance(client_completed, str) and len(client_completed) == 16:
-                            client_completed = client_completed + ":00"
-                        parsed = parse_datetime(client_completed)
-                    except Exception:
-                        parsed = None
-                if parsed:
-                    updated.completed_at = parsed
-                    updated.save()
-            else:
-                # if status became 'complete' and completed_at is empty, set now
-                if updated.status == "complete" and not updated.completed_at:
-                    updated.completed_at = timezone.now()
-                    updated.save()
+
+            # if status becomes 'complete' and completed_at is empty, set now (in the same save)
+            # client-sent completed_at (ISO or datetime-local) is parsed by the serializer field
+            extra = {}
+            new_status = serializer.validated_data.get("status", progress.status)
+            new_completed = serializer.validated_data.get("completed_at", progress.completed_at)
+            if new_status == "complete" and not new_completed:
+                extra["completed_at"] = timezone.now()
+
+            updated = serializer.save(**extra)
 
             return Response(self.get_serializer(updated, context={"request": request}).data)
 
@@ -185,10 +242,9 @@ class MiniProjectViewSet(viewsets.ModelViewSet):
         Returns: updated TraineeProgress serialized.
         """
         project = self.get_object()
-        user = request.user
 
         # only trainers reach this because of permission_classes, but keep defensive check
-        if not (getattr(user, "profile", None) and getattr(user.profile, "role", None) == "trainer"):
+        if get_role(request) != "trainer":
             return Response({"detail": "Only trainers may post comments."}, status=status.HTTP_403_FORBIDDEN)
 
         trainee_id = request.data.get("trainee")
@@ -197,21 +253,20 @@ class MiniProjectViewSet(viewsets.ModelViewSet):
         if not trainee_id or not comment_text:
             return Response({"detail": "Provide both trainee (id) and comment."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # ensure trainee exists
-        try:
-            trainee = User.objects.get(pk=trainee_id)
-        except User.DoesNotExist:
-            return Response({"detail": "Trainee not found."}, status=status.HTTP_404_NOT_FOUND)
-
-        if trainee not in project.assigned_to.all():
+        # fetch the trainee through the assignment so existence + membership is a single query
+        trainee = project.assigned_to.filter(pk=trainee_id).only(*USER_SUMMARY_FIELDS).first()
+        if trainee is None:
+            # only the error path pays for telling "unknown user" apart from "not assigned"
+            if not User.objects.filter(pk=trainee_id).exists():
+                return Response({"detail": "Trainee not found."}, status=status.HTTP_404_NOT_FOUND)
             return Response({"detail": "Trainee is not assigned to this project."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # get or create progress entry for that trainee
-        progress, created = TraineeProgress.objects.get_or_create(trainee=trainee, project=project)
-
-        # set the trainer comment and save
-        progress.trainer_comment = comment_text
-        progress.save()
+        # upsert the trainer comment on that trainee's progress entry
+        progress, created = TraineeProgress.objects.update_or_create(
+            trainee=trainee, project=project, defaults={"trainer_comment": comment_text}
+        )
+        # reuse the trainee we already loaded for trainee_details
+        progress.trainee = trainee
 
         serializer = TraineeProgressSerializer(progress, context={"request": request})
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -221,11 +276,18 @@ class MeView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        # return user including role for frontend convenience
-        return Response(UserWithRoleSerializer(request.user).data)
+        # return user including role for frontend convenience; built by hand because
+        # every frontend bootstrap hits this and the payload is only four fields
+        user = request.user
+        return Response({
+            "id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "role": get_role(request),
+        })
 
 
 class UserListView(generics.ListAPIView):
-    queryset = User.objects.all()
+    queryset = User.objects.only(*USER_SUMMARY_FIELDS)
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]